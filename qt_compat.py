@@ -0,0 +1,32 @@
+#!/usr/bin/env python
+
+"""
+
+.. module:: qt_compat
+   :platform: Unix, Windows, MacOSX
+   :synopsis: PySide2/PyQt5 compatibility layer for RoboUI
+
+.. moduleauthor:: Marcin Bielewicz <marcin.bielewicz@gmail.com>
+
+``qt_compat`` module picks available Qt bindings once: *PySide2* if
+installed, *PyQt5* otherwise, and exposes Qt classes used by ``roboui``
+under common names.
+"""
+
+try:
+    from PySide2 import QtCore, QtGui, QtWidgets
+    Signal = QtCore.Signal
+except ImportError:
+    from PyQt5 import QtCore, QtGui, QtWidgets
+    Signal = QtCore.pyqtSignal
+
+QTimer = QtCore.QTimer
+QPixmap = QtGui.QPixmap
+QAction = QtWidgets.QAction
+QApplication = QtWidgets.QApplication
+QLabel = QtWidgets.QLabel
+QMainWindow = QtWidgets.QMainWindow
+QMenu = QtWidgets.QMenu
+QMessageBox = QtWidgets.QMessageBox
+QPushButton = QtWidgets.QPushButton
+QWidget = QtWidgets.QWidget
@@ -29,6 +29,8 @@ for controlling *Velleman KSR10*/*OWI-535* roboarm
 
     Device ``005`` on Bus ``001``, detected as *Logic3 / SpectraVideo plc* is in fact *Velleman KSR10*/*OWI-535* roboarm USB controller.
 """
+from array import array
+from functools import partial
 import usb.core
 import usb.util
 import time
@@ -42,75 +44,307 @@ Default duration of RoboArm command.
    Can be changed only by experienced users (motors can stuck if too long)
 """
 
+
+# Vendor control request sent with every command:
+# bmRequestType, bRequest, wValue, wIndex
+_CTRL_REQUEST = (0x40, 6, 0x100, 0)
+
+# Control transfer timeout, in milliseconds
+_TIMEOUT = 3
+
+# Pre-built USB command buffers, passed to pyusb as-is (no per-call conversion)
+_CMD_STOP = array('B', (0, 0, 0))
+_CMD_LIGHT_ON = array('B', (0, 0, 1))
+_CMD_BASE_COUNTERCLOCKWISE = array('B', (0, 1, 0))
+_CMD_BASE_CLOCKWISE = array('B', (0, 2, 0))
+_CMD_ELBOW_UP = array('B', (32, 0, 0))
+_CMD_ELBOW_DOWN = array('B', (16, 0, 0))
+_CMD_WRIST_UP = array('B', (8, 0, 0))
+_CMD_WRIST_DOWN = array('B', (4, 0, 0))
+_CMD_SHOULDER_UP = array('B', (64, 0, 0))
+_CMD_SHOULDER_DOWN = array('B', (128, 0, 0))
+_CMD_GRIP_OPEN = array('B', (2, 0, 0))
+_CMD_GRIP_CLOSE = array('B', (1, 0, 0))
+
+_COMMANDS = {
+    "base_counterclockwise": _CMD_BASE_COUNTERCLOCKWISE,
+    "base_anticlockwise": _CMD_BASE_COUNTERCLOCKWISE,
+    "base_clockwise": _CMD_BASE_CLOCKWISE,
+    "elbow_up": _CMD_ELBOW_UP,
+    "elbow_down": _CMD_ELBOW_DOWN,
+    "wrist_up": _CMD_WRIST_UP,
+    "wrist_down": _CMD_WRIST_DOWN,
+    "shoulder_up": _CMD_SHOULDER_UP,
+    "shoulder_down": _CMD_SHOULDER_DOWN,
+    "grip_open": _CMD_GRIP_OPEN,
+    "grip_close": _CMD_GRIP_CLOSE,
+}
+"""
+Timed moves available through ``RoboArm.send``, by name
+"""
+
+
+def _sleep_then(duration, callback):
+    """
+    Default ``RoboArm`` scheduler: block for ``duration`` seconds,
+    then call ``callback``
+
+    :param float duration: delay in seconds
+    :param callable callback: function to call after the delay
+    """
+    time.sleep(duration)
+    callback()
+
+
+def _bind_xfer(device):
+    """
+    Bind the vendor request, the same for every command, to ``device``
+
+    The device is already open and configured, so the transfer goes
+    straight to the pyusb backend, skipping ``Device.ctrl_transfer``
+    bookkeeping (buffers must be ``array('B')``, see ``_CMD_*``).
+
+    This relies on pyusb internals (checked against pyusb 1.3.1, same
+    since 1.0):
+
+    * ``Device._ctx.handle`` is the backend device handle, opened by
+      ``set_configuration``/``claim_interface`` and kept open until
+      ``usb.util.dispose_resources`` (see ``RoboArm.close``);
+    * ``backend.ctrl_transfer(handle, bmRequestType, bRequest, wValue,
+      wIndex, data, timeout)`` signature, shared by all backends.
+
+    The handle is captured once: unlike ``Device.ctrl_transfer``, nothing
+    reopens the device, so the result must not be used after the
+    resources are disposed. When the internals are not there, falls back
+    to ``Device.ctrl_transfer``.
+
+    :param usb.core.Device device: opened and configured arm device
+    :return: ``xfer(data, timeout)`` callable
+    """
+    try:
+        backend = device.backend
+        handle = device._ctx.handle
+    except AttributeError:
+        handle = None
+    if handle is None:
+        return partial(device.ctrl_transfer, *_CTRL_REQUEST)
+    return partial(backend.ctrl_transfer, handle, *_CTRL_REQUEST)
+
+
+def _closed_xfer(*args):
+    """
+    Stand-in for ``RoboArm._xfer`` once the arm is closed
+
+    :raise ValueError: always
+    """
+    raise ValueError("Arm closed")
+
+
 class RoboArm():
     """
     Control your roboarm with few useful methods
     """
 
-    def __init__(self):
+    __slots__ = ("arm", "scheduler", "_xfer", "_busy", "_cancelled")
+
+    def __init__(self, scheduler=None):
         """
-        .. method:: __init__(self)
+        .. method:: __init__(self, scheduler=None)
 
            Default constructor
 
+        :param callable scheduler: ``scheduler(duration, callback)`` used to
+           stop the motors after a move; blocks with ``time.sleep`` by default
         :raise ValueError: when arm is not connected
+        :raise usb.core.USBError: when arm cannot be configured (e.g. permissions)
+
+        .. note::
+           GUI applications should pass a scheduler based on their event
+           loop timers (e.g. ``QTimer.singleShot``), so that no move
+           blocks the UI thread
         """
+        self.scheduler = scheduler or _sleep_then
+        self._busy = False
+        self._cancelled = False
         self.arm = usb.core.find(
             idVendor=0x1267,
             idProduct=0x001)
         if not self.arm:
             raise ValueError("Arm not connected")
+        # Set the device up once, instead of letting pyusb do it lazily
+        try:
+            try:
+                if self.arm.is_kernel_driver_active(0):
+                    self.arm.detach_kernel_driver(0)
+            except NotImplementedError:
+                # Kernel driver detaching is available on Linux only
+                pass
+            self.arm.set_configuration()
+            usb.util.claim_interface(self.arm, 0)
+            self._xfer = _bind_xfer(self.arm)
+        except BaseException:
+            # Do not leak the device handle opened by the calls above
+            usb.util.dispose_resources(self.arm)
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Stop the motors and release the USB device
+
+        Called automatically when ``RoboArm`` is used as a context manager::
+
+           with RoboArm() as arm:
+               arm.elbow_up()
+
+        Calling ``close`` again does nothing.
+
+        .. note::
+           The arm object cannot be used after it was closed: any further
+           command raises ``ValueError``
+        """
+        if self._xfer is _closed_xfer:
+            return
+        try:
+            self.stop()
+        finally:
+            # The device handle bound in _xfer is freed below
+            self._xfer = _closed_xfer
+            self._busy = False
+            try:
+                usb.util.release_interface(self.arm, 0)
+            finally:
+                usb.util.dispose_resources(self.arm)
+
+    def _start(self, command):
+        """
+        Turn on the motors according to ``command``
+
+        :param array command: pre-defined move state (one of ``_CMD_*``)
+        """
+        self._xfer(command, _TIMEOUT)
+        self._busy = True
+
+    def _stop(self):
+        """
+        Stop the motors started with ``_start``
+        """
+        try:
+            self._xfer(_CMD_STOP, _TIMEOUT)
+        finally:
+            self._busy = False
 
     def __move_arm__(self, command, duration=DefaultDuration):
         """
         Generic roboarm command
 
-        :param list command: list with pre-defined move state
+        :param array command: pre-defined move state (one of ``_CMD_*``)
         :param float duration: Lenght of command, in secs
 
         .. note::
            This is, in general, the method you *might* want to extend (errors, responses, exceptions, and so on)
+
+        .. note::
+           The command is ignored while a previous move is still running
+           (only possible with a non-blocking scheduler)
+        """
+        if self._busy:
+            return
+        self._start(command)
+        try:
+            self.scheduler(duration, self._stop)
+        except BaseException:
+            # E.g. KeyboardInterrupt while sleeping: do not leave
+            # the motors running, nor the arm busy
+            self._stop()
+            raise
+
+    def send(self, name, duration=DefaultDuration):
         """
-        # Move motor:
-        self.arm.ctrl_transfer(
-            0x40,
-            6,
-            0x100,
-            0,
-            command,
-            3)
-        time.sleep(duration)
-        # Stop motor:
-        command=[0,0,0]
-        self.arm.ctrl_transfer(
-            0x40,
-            6,
-            0x100,
-            0,
-            command,
-            3)
+        Run a timed move by its name
+
+        :param str name: move name, same as the matching method
+           (e.g. ``"elbow_up"``)
+        :param float duration: move duration time in seconds
+        :raise KeyError: when ``name`` is not a known move
+        """
+        self.__move_arm__(_COMMANDS[name], duration)
+
+    def sequence(self, steps):
+        """
+        Run several timed moves back to back
+
+        Each move is sent as soon as the previous one ends, without
+        stopping the motors in between; motors are stopped once after
+        the last move.
+
+        :param list steps: ``(name, duration)`` pairs, names as in ``send``
+        :raise KeyError: when any name is not a known move
+
+        .. note::
+           Like other moves, the sequence is ignored while a previous
+           move is still running; ``stop`` cancels remaining moves
+        """
+        if self._busy:
+            return
+        commands = [(_COMMANDS[name], duration) for name, duration in steps]
+        self._cancelled = False
+        self._run_steps(iter(commands))
+
+    def _run_steps(self, steps):
+        """
+        Run moves of a ``sequence``
+
+        A synchronous scheduler calls back before returning, and the loop
+        simply goes on with the next move. Otherwise the loop returns and
+        the scheduler callback resumes it later, so the stack never grows
+        with the number of moves.
+
+        :param iterator steps: remaining ``(command, duration)`` pairs
+        """
+        try:
+            for command, duration in steps:
+                if self._cancelled:
+                    break
+                self._start(command)
+                waiting = [True]
+                self.scheduler(duration, partial(self._step_done, steps, waiting))
+                if waiting[0]:
+                    # Move still running, _step_done resumes the loop
+                    waiting[0] = False
+                    return
+        except BaseException:
+            # Do not leave the motors running, nor the arm busy
+            self._stop()
+            raise
+        self._stop()
+
+    def _step_done(self, steps, waiting):
+        """
+        Scheduler callback ending a ``sequence`` move
+
+        :param iterator steps: remaining ``(command, duration)`` pairs
+        :param list waiting: ``[True]`` while ``_run_steps`` is still
+           inside the scheduler call
+        """
+        if waiting[0]:
+            waiting[0] = False
+        else:
+            self._run_steps(steps)
 
     def stop(self):
-        """Stop motor immediately"""
-        command=[0, 0, 0]
-        self.arm.ctrl_transfer(
-            0x40,
-            6,
-            0x100,
-            0,
-            command,
-            3)
+        """Stop motor immediately, cancelling remaining ``sequence`` moves"""
+        self._cancelled = True
+        self._xfer(_CMD_STOP, _TIMEOUT)
 
     def light_on(self, duration=DefaultDuration):
         """Turn the LED on"""
-        command = [0, 0, 1]
-        self.arm.ctrl_transfer(
-            0x40,
-            6,
-            0x100,
-            0,
-            command,
-            3)
+        self._xfer(_CMD_LIGHT_ON, _TIMEOUT)
 
     def light_off(self):
         """Turn the LED off"""
@@ -125,7 +359,9 @@ class RoboArm():
         .. warning::
            Base motor does not detect if end reached
         """
-        self.__move_arm__([0,1,0], duration)
+        self.__move_arm__(_CMD_BASE_COUNTERCLOCKWISE, duration)
+
+    base_anticlockwise = base_counterclockwise
 
     def base_clockwise(self, duration=DefaultDuration):
         """
@@ -136,7 +372,7 @@ class RoboArm():
         .. warning::
            Base motor does not detect if end reached
         """
-        self.__move_arm__([0,2,0], duration)
+        self.__move_arm__(_CMD_BASE_CLOCKWISE, duration)
 
     def elbow_up(self, duration=DefaultDuration):
         """
@@ -147,7 +383,7 @@ class RoboArm():
         .. warning::
            Elbow motor does not detect if end reached
         """
-        self.__move_arm__([32,0,0], duration)
+        self.__move_arm__(_CMD_ELBOW_UP, duration)
 
     def elbow_down(self, duration=DefaultDuration):
         """
@@ -158,7 +394,7 @@ class RoboArm():
         .. warning::
            Elbow motor does not detect if end reached
         """
-        self.__move_arm__([16,0,0], duration)
+        self.__move_arm__(_CMD_ELBOW_DOWN, duration)
 
     def wrist_up(self, duration=DefaultDuration):
         """
@@ -170,7 +406,7 @@ class RoboArm():
            Wrist motor does not detect if end reached
         """
 
-        self.__move_arm__([8,0,0], duration)
+        self.__move_arm__(_CMD_WRIST_UP, duration)
 
     def wrist_down(self, duration=DefaultDuration):
         """
@@ -181,7 +417,7 @@ class RoboArm():
         .. warning::
            Wrist motor does not detect if end reached
         """
-        self.__move_arm__([4,0,0], duration)
+        self.__move_arm__(_CMD_WRIST_DOWN, duration)
 
 
     def shoulder_up(self, duration=DefaultDuration):
@@ -193,7 +429,7 @@ class RoboArm():
         .. warning::
            Shoulder motor does not detect if end reached
         """
-        self.__move_arm__([64,0,0], duration)
+        self.__move_arm__(_CMD_SHOULDER_UP, duration)
 
     def shoulder_down(self, duration=DefaultDuration):
         """
@@ -204,7 +440,7 @@ class RoboArm():
         .. warning::
            Shoulder motor does not detect if end reached
         """
-        self.__move_arm__([128,0,0], duration)
+        self.__move_arm__(_CMD_SHOULDER_DOWN, duration)
 
     def grip_open(self, duration=DefaultDuration):
         """
@@ -215,7 +451,7 @@ class RoboArm():
         .. warning::
            Grip motor does not detect if fully open
         """
-        self.__move_arm__([2,0,0], duration)
+        self.__move_arm__(_CMD_GRIP_OPEN, duration)
 
     def grip_close(self, duration=DefaultDuration):
         """
@@ -226,4 +462,4 @@ class RoboArm():
         .. warning::
            Grip motor does not detect if fully closed
         """
-        self.__move_arm__([1,0,0], duration)
+        self.__move_arm__(_CMD_GRIP_CLOSE, duration)
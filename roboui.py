@@ -58,38 +58,84 @@ your *Velleman KSR10*/*OWI-535* roboarm
 
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 import usb.core
 
-try:
-    from PySide2.QtGui import QPixmap
-    from PySide2.QtWidgets import QAction
-    from PySide2.QtWidgets import QApplication
-    from PySide2.QtWidgets import QLabel
-    from PySide2.QtWidgets import QMainWindow
-    from PySide2.QtWidgets import QMenu
-    from PySide2.QtWidgets import QMessageBox
-    from PySide2.QtWidgets import QPushButton
-    from PySide2.QtWidgets import QWidget
-except ImportError:
-    from PyQt5.QtGui import QPixmap
-    from PyQt5.QtWidgets import QAction
-    from PyQt5.QtWidgets import QApplication
-    from PyQt5.QtWidgets import QLabel
-    from PyQt5.QtWidgets import QMainWindow
-    from PyQt5.QtWidgets import QMenu
-    from PyQt5.QtWidgets import QMessageBox
-    from PyQt5.QtWidgets import QPushButton
-    from PyQt5.QtWidgets import QWidget
+from qt_compat import QAction
+from qt_compat import QApplication
+from qt_compat import QLabel
+from qt_compat import QMainWindow
+from qt_compat import QMessageBox
+from qt_compat import QPixmap
+from qt_compat import QPushButton
+from qt_compat import QTimer
+from qt_compat import Signal
 
 import roboarm
 
+
+_BUTTONS = (
+    # attribute, label, x, y, width, height, RoboArm method
+    ("baseclock", "<<", 150, 320, 30, 20, "base_clockwise"),
+    ("basecounter", ">>", 150, 350, 30, 20, "base_counterclockwise"),
+    ("lighton", "[*]", 15, 50, 20, 20, "light_on"),
+    ("lightoff", "[ ]", 15, 80, 20, 20, "light_off"),
+    ("elbowup", "^", 220, 100, 20, 20, "elbow_up"),
+    ("elbowdown", "v", 220, 130, 20, 20, "elbow_down"),
+    ("wristup", "^", 450, 60, 20, 20, "wrist_up"),
+    ("wristdown", "v", 450, 90, 20, 20, "wrist_down"),
+    ("shoulderup", "^", 200, 210, 20, 20, "shoulder_up"),
+    ("shoulderdown", "v", 200, 240, 20, 20, "shoulder_down"),
+    ("gripopen", "<-  ->", 80, 180, 40, 20, "grip_open"),
+    ("gripclose", "-> <-", 80, 210, 40, 20, "grip_close"),
+)
+"""
+Control buttons placed over the arm picture
+"""
+
+_PIXMAP = None
+
+
+def _get_pixmap():
+    """
+    Arm picture, loaded from next to this module on first use only
+    (``QPixmap`` needs a running ``QApplication``)
+    """
+    global _PIXMAP
+    if _PIXMAP is None:
+        _PIXMAP = QPixmap(os.path.join(
+            os.path.dirname(os.path.abspath(__file__)),
+            "av9-ksr10.jpg"))
+    return _PIXMAP
+
+
 class RoboWindow(QMainWindow):
+    usb_error = Signal(str)
+    """Emitted from the USB thread when a ``RoboArm`` call fails"""
+
+    delay_requested = Signal(float, object)
+    """Emitted from the USB thread to start a timer in the UI thread"""
+
     def __init__(self):
         super().__init__()
+        # All RoboArm calls run on this single thread, so the UI thread
+        # never waits for USB transfers to complete
+        self._usb = ThreadPoolExecutor(max_workers=1)
+        # Set once the window is closing; no USB calls are accepted then
+        self._closing = False
+        self.usb_error.connect(self.show_err)
+        self.delay_requested.connect(self.__start_delay)
+        # Error box is reused for every error message
+        self._errbox = QMessageBox(self)
+        self._errbox.setIcon(QMessageBox.Critical)
+        self._errbox.setWindowTitle("Error")
+        self._errbox.setStandardButtons(QMessageBox.Ok)
         self.__create_ui()
+        self.arm = None
         try:
-            self.arm = roboarm.RoboArm()
-        except ValueError as ve:
+            self.arm = roboarm.RoboArm(self.__schedule)
+        except (ValueError, usb.core.USBError) as ve:
             self.show_err(str(ve))
             self.close()
 
@@ -97,12 +143,53 @@ class RoboWindow(QMainWindow):
         """
         Standard closeEvent handler.
 
-        Stop the motors and accept handler (allow close)
+        Stop the motors and release the arm (waiting for it to finish)
+        and accept handler (allow close)
         """
-        if self.arm:
-            self.arm.stop()
+        if not self._closing:
+            self._closing = True
+            closed = self._usb.submit(self.arm.close) if self.arm else None
+            self._usb.shutdown()
+            if closed is not None and closed.exception() is not None:
+                self.show_err(str(closed.exception()))
         event.accept()
 
+    def __schedule(self, duration, callback):
+        """
+        ``RoboArm`` scheduler, called from the USB thread.
+
+        :param float duration: delay in seconds
+        :param callable callback: ``RoboArm`` method to run after the delay
+        """
+        self.delay_requested.emit(duration, callback)
+
+    def __start_delay(self, duration, callback):
+        """
+        Run ``callback`` on the USB thread after ``duration`` seconds,
+        without blocking the Qt event loop
+        """
+        QTimer.singleShot(int(duration * 1000), partial(self._submit, callback))
+
+    def _submit(self, call):
+        """
+        Run ``call`` on the USB thread; errors are reported back
+        to the UI thread via ``usb_error`` signal
+
+        :param callable call: ``RoboArm`` method to run
+        """
+        if self._closing:
+            # Timers may still fire after the USB thread was shut down
+            return
+        self._usb.submit(call).add_done_callback(self.__on_done)
+
+    def __on_done(self, future):
+        """
+        Report a failed ``RoboArm`` call, if any
+        """
+        error = future.exception()
+        if error is not None:
+            self.usb_error.emit(str(error))
+
     def __create_menu(self):
         """
         Create simple app menu
@@ -124,12 +211,13 @@ class RoboWindow(QMainWindow):
 
         :param str errmsg: Error message to display
         """
-        msgBox = QMessageBox()
-        msgBox.setIcon(QMessageBox.Critical)
-        msgBox.setText(errmsg)
-        msgBox.setWindowTitle("Error")
-        msgBox.setStandardButtons(QMessageBox.Ok)
-        msgBox.exec()
+        if self._errbox.isVisible():
+            # Called from the box's own event loop: do not replace the
+            # message being shown, nor exec() the box again
+            self._errbox.setText(self._errbox.text() + "\n" + errmsg)
+            return
+        self._errbox.setText(errmsg)
+        self._errbox.exec()
 
     def on_about(self):
         """
@@ -145,113 +233,17 @@ class RoboWindow(QMainWindow):
         ad.setStandardButtons(QMessageBox.Ok)
         ad.exec_()
 
-    def on_baseclock(self):
-        """
-        Rotate the base clockwise with a duration predefined in ``roboarm`` module
-        """
-        try:
-            self.arm.base_clockwise()
-        except usb.core.USBError as usbe:
-            self.show_err(str(usbe))
-
-    def on_basecounter(self):
-        """
-        Rotate the base counterclockwise with a duration predefined in ``roboarm`` module
-        """
-        try:
-            self.arm.base_counterclockwise()
-        except usb.core.USBError as usbe:
-            self.show_err(str(usbe))
-
-    def on_wristup(self):
-        """
-        Move the wrist up with a duration predefined in ``roboarm`` module
-        """
-        try:
-            self.arm.wrist_up()
-        except usb.core.USBError as usbe:
-            self.show_err(str(usbe))
-
-    def on_wristdown(self):
-        """
-        Move the wrist down with a duration predefined in ``roboarm`` module
-        """
-        try:
-            self.arm.wrist_down()
-        except usb.core.USBError as usbe:
-            self.show_err(str(usbe))
-
-    def on_shoulderup(self):
-        """
-        Move the shoulder up with a duration predefined in ``roboarm`` module
-        """
-        try:
-            self.arm.shoulder_up()
-        except usb.core.USBError as usbe:
-            self.show_err(str(usbe))
-
-    def on_shoulderdown(self):
-        """
-        Move the shoulder down with a duration predefined in ``roboarm`` module
-        """
-        try:
-            self.arm.shoulder_down()
-        except usb.core.USBError as usbe:
-            self.show_err(str(usbe))
-
-    def on_elbowup(self):
-        """
-        Move the elbow up with a duration predefined in ``roboarm`` module
-        """
-        try:
-            self.arm.elbow_up()
-        except usb.core.USBError as usbe:
-            self.show_err(str(usbe))
-
-    def on_elbowdown(self):
-        """
-        Move the elbow down with a duration predefined in ``roboarm`` module
+    def _dispatch(self, action, checked=False):
         """
-        try:
-            self.arm.elbow_down()
-        except usb.core.USBError as usbe:
-            self.show_err(str(usbe))
+        Run a ``RoboArm`` action with a duration predefined in ``roboarm`` module
 
-    def on_lighton(self):
+        :param str action: name of the ``RoboArm`` method to call
+        :param bool checked: button state passed by ``clicked`` signal (unused)
         """
-        Turn on the LED
-        """
-        try:
-            self.arm.light_on()
-        except usb.core.USBError as usbe:
-            self.show_err(str(usbe))
-
-    def on_lightoff(self):
-        """
-        Turn off the LED
-        """
-        try:
-            self.arm.light_off()
-        except usb.core.USBError as usbe:
-            self.show_err(str(usbe))
-
-    def on_gripopen(self):
-        """
-        Open the grip with a duration predefined in ``roboarm`` module
-        """
-        try:
-            self.arm.grip_open()
-        except usb.core.USBError as usbe:
-            self.show_err(str(usbe))
-
-    def on_gripclose(self):
-        """
-        Close the grip with a duration predefined in ``roboarm`` module
-        """
-        try:
-            self.arm.grip_close()
-        except usb.core.USBError as usbe:
-            self.show_err(str(usbe))
+        if self.arm is None:
+            # Arm could not be opened
+            return
+        self._submit(getattr(self.arm, action))
 
     def __create_ui(self):
         """
@@ -259,60 +251,19 @@ class RoboWindow(QMainWindow):
         """
         self.__create_menu()
         self.image = QLabel(self)
-        pixmap = QPixmap("av9-ksr10.jpg")
-        self.image.setPixmap(pixmap)
-        self.baseclock = QPushButton("<<", self.image)
-        self.baseclock.clicked.connect(self.on_baseclock)
-        self.baseclock.move(150, 320)
-        self.baseclock.resize(30, 20)
-        self.basecounter = QPushButton(">>", self.image)
-        self.basecounter.clicked.connect(self.on_basecounter)
-        self.basecounter.move(150, 350)
-        self.basecounter.resize(30, 20)
-        self.lighton = QPushButton("[*]", self.image)
-        self.lighton.clicked.connect(self.on_lighton)
-        self.lighton.move(15, 50)
-        self.lighton.resize(20, 20)
-        self.lightoff = QPushButton("[ ]", self.image)
-        self.lightoff.resize(20, 20)
-        self.lightoff.move(15, 80)
-        self.lightoff.clicked.connect(self.on_lightoff)
-        self.elbowup = QPushButton("^", self.image)
-        self.elbowup.clicked.connect(self.on_elbowup)
-        self.elbowup.resize(20, 20)
-        self.elbowup.move(220, 100)
-        self.elbowdown = QPushButton("v", self.image)
-        self.elbowdown.clicked.connect(self.on_elbowdown)
-        self.elbowdown.resize(20, 20)
-        self.elbowdown.move(220, 130)
-        self.wristup = QPushButton("^", self.image)
-        self.wristup.clicked.connect(self.on_wristup)
-        self.wristup.resize(20, 20)
-        self.wristup.move(450, 60)
-        self.wristdown = QPushButton("v", self.image)
-        self.wristdown.clicked.connect(self.on_wristdown)
-        self.wristdown.resize(20, 20)
-        self.wristdown.move(450, 90)
-        self.shoulderup = QPushButton("^", self.image)
-        self.shoulderup.clicked.connect(self.on_shoulderup)
-        self.shoulderup.resize(20, 20)
-        self.shoulderup.move(200, 210)
-        self.shoulderdown = QPushButton("v", self.image)
-        self.shoulderdown.clicked.connect(self.on_shoulderdown)
-        self.shoulderdown.resize(20, 20)
-        self.shoulderdown.move(200, 240)
-        self.gripopen = QPushButton("<-  ->", self.image)
-        self.gripopen.clicked.connect(self.on_gripopen)
-        self.gripopen.resize(40, 20)
-        self.gripopen.move(80, 180)
-        self.gripclose = QPushButton("-> <-", self.image)
-        self.gripclose.clicked.connect(self.on_gripclose)
-        self.gripclose.resize(40, 20)
-        self.gripclose.move(80, 210)
+        self.image.setPixmap(_get_pixmap())
+        for name, label, x, y, w, h, action in _BUTTONS:
+            button = QPushButton(label, self.image)
+            button.move(x, y)
+            button.resize(w, h)
+            button.clicked.connect(partial(self._dispatch, action))
+            setattr(self, name, button)
         self.setCentralWidget(self.image)
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     window = RoboWindow()
+    if window.arm is None:
+        sys.exit(1)
     window.show()
     sys.exit(app.exec_())
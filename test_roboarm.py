@@ -0,0 +1,138 @@
+"""
+Tests for ``roboarm`` module, run against a recording fake of the arm device
+"""
+import pytest
+import usb.core
+import usb.util
+
+import roboarm
+
+
+class FakeArm():
+    """
+    Stand-in for ``usb.core.Device``, recording every control transfer
+    """
+
+    def __init__(self):
+        self.sent = []
+
+    def is_kernel_driver_active(self, interface):
+        return False
+
+    def set_configuration(self):
+        pass
+
+    def ctrl_transfer(self, bmRequestType, bRequest, wValue, wIndex,
+                      data, timeout):
+        self.sent.append(list(data))
+
+
+class Later():
+    """
+    Asynchronous scheduler: callbacks run only when ``run_next`` is called
+    """
+
+    def __init__(self):
+        self.pending = []
+
+    def __call__(self, duration, callback):
+        self.pending.append(callback)
+
+    def run_next(self):
+        self.pending.pop(0)()
+
+
+STOP = [0, 0, 0]
+
+
+@pytest.fixture
+def device(monkeypatch):
+    fake = FakeArm()
+    monkeypatch.setattr(usb.core, "find", lambda **kwargs: fake)
+    for name in ("claim_interface", "release_interface", "dispose_resources"):
+        monkeypatch.setattr(usb.util, name, lambda *args: None)
+    monkeypatch.setattr(roboarm.time, "sleep", lambda duration: None)
+    return fake
+
+
+def test_move_sends_command_then_stop(device):
+    roboarm.RoboArm().elbow_up()
+    assert device.sent == [[32, 0, 0], STOP]
+
+
+def test_move_dropped_while_busy(device):
+    later = Later()
+    arm = roboarm.RoboArm(later)
+    arm.elbow_up()
+    arm.wrist_down()
+    assert device.sent == [[32, 0, 0]]
+    later.run_next()
+    assert device.sent == [[32, 0, 0], STOP]
+    assert not later.pending
+
+
+def test_interrupted_move_stops_motors(device):
+    def interrupt(duration, callback):
+        raise KeyboardInterrupt
+
+    arm = roboarm.RoboArm(interrupt)
+    with pytest.raises(KeyboardInterrupt):
+        arm.elbow_up()
+    assert device.sent == [[32, 0, 0], STOP]
+    arm.scheduler = roboarm._sleep_then
+    arm.elbow_down()
+    assert device.sent[-2:] == [[16, 0, 0], STOP]
+
+
+def test_sequence_sends_steps_and_one_stop(device):
+    later = Later()
+    arm = roboarm.RoboArm(later)
+    arm.sequence([("shoulder_up", 1), ("base_anticlockwise", 1),
+                  ("grip_close", 1)])
+    while later.pending:
+        later.run_next()
+    assert device.sent == [[64, 0, 0], [0, 1, 0], [1, 0, 0], STOP]
+
+
+@pytest.mark.parametrize("scheduler", [
+    roboarm._sleep_then,
+    lambda duration, callback: callback(),
+])
+def test_long_sequence_with_synchronous_scheduler(device, scheduler):
+    steps = 5000
+    arm = roboarm.RoboArm(scheduler)
+    arm.sequence([("elbow_up", 0)] * steps)
+    assert len(device.sent) == steps + 1
+    assert device.sent[-1] == STOP
+
+
+def test_stop_cancels_sequence(device):
+    later = Later()
+    arm = roboarm.RoboArm(later)
+    arm.sequence([("elbow_up", 1), ("wrist_up", 1)])
+    arm.stop()
+    later.run_next()
+    assert device.sent == [[32, 0, 0], STOP, STOP]
+    assert not later.pending
+    arm.grip_open()
+    assert device.sent[-1] == [2, 0, 0]
+
+
+def test_close_twice(device, monkeypatch):
+    disposed = []
+    monkeypatch.setattr(usb.util, "dispose_resources", disposed.append)
+    with roboarm.RoboArm() as arm:
+        pass
+    arm.close()
+    assert device.sent == [STOP]
+    assert disposed == [device]
+
+
+def test_commands_after_close_raise(device):
+    arm = roboarm.RoboArm()
+    arm.close()
+    with pytest.raises(ValueError):
+        arm.elbow_up()
+    with pytest.raises(ValueError):
+        arm.stop()
+    assert device.sent == [STOP]